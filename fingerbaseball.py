@@ -0,0 +1,167 @@
+'''
+command line entry point for batch simulation jobs
+
+    python fingerbaseball.py simulate calculated conservative --games 1000 --seed 7
+    python fingerbaseball.py tournament random calculated expected-value --games 500
+    python fingerbaseball.py bench calculated calculated --games 200
+
+strategies are named by their key in players.REGISTRY, optionally followed by constructor parameters, e.g. "ngram:order=2"
+results are printed as one JSON object per line; NumPy and the players are only imported once the arguments have parsed
+'''
+import argparse
+import json
+import sys
+import time
+
+class StrategyError(Exception):
+    '''
+    raised for a strategy spec that names an unknown strategy or passes it parameters it does not take
+    '''
+    pass
+
+def positive_int(text):
+    '''
+    argparse type for counts that must be at least one
+    '''
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError('{!r} is not an integer'.format(text))
+    if value < 1:
+        raise argparse.ArgumentTypeError('{} is not a positive integer'.format(value))
+    return value
+
+def parse_strategy(spec):
+    '''
+    split a strategy spec like "name:key=value,key=value" into its name and a dict of parameters
+    values are read as JSON where possible (so numbers and booleans work) and left as strings otherwise
+    '''
+    name, _, param_string = spec.partition(':')
+    params = {}
+    for item in filter(None,param_string.split(',')):
+        key, eq, value = item.partition('=')
+        if not eq:
+            raise argparse.ArgumentTypeError('parameter {!r} in {!r} should look like key=value'.format(item,spec))
+        try:
+            params[key] = json.loads(value)
+        except ValueError:
+            params[key] = value
+    return name, params
+
+def build(spec):
+    '''
+    build a player from a parsed strategy spec
+    '''
+    from players import REGISTRY
+    name, params = spec
+    if name not in REGISTRY:
+        raise StrategyError('unknown strategy {!r}, choose from {}'.format(name,', '.join(sorted(REGISTRY))))
+    try:
+        return REGISTRY[name](**params)
+    except (TypeError,ValueError) as e: # parameter the strategy does not take, or a value it rejects
+        raise StrategyError('bad parameters for {!r}: {}'.format(name,e))
+
+def label(spec):
+    '''
+    name a strategy spec in output
+    '''
+    name, params = spec
+    if not params:
+        return name
+    return name + ':' + ','.join('{}={}'.format(k,json.dumps(v)) for k,v in params.items())
+
+def seed_rng(seed):
+    '''
+    seed the global NumPy generator used by the players and the simulator
+    '''
+    if seed is not None:
+        from numpy.random import seed as np_seed
+        np_seed(seed)
+
+def emit(record):
+    '''
+    print a single machine-readable result line
+    '''
+    print(json.dumps(record))
+
+def matchup(p1_spec,p2_spec,n_games):
+    '''
+    simulate n_games between two strategy specs and return a result record
+    '''
+    from sim_scaffolding import simulate_games
+    res = simulate_games(build(p1_spec),build(p2_spec),n_games=n_games,verbose=False)
+    record = {'p1':label(p1_spec),'p2':label(p2_spec),'games':n_games}
+    record.update(res)
+    return record
+
+def simulate(args):
+    seed_rng(args.seed)
+    emit(matchup(args.p1,args.p2,args.games))
+
+def tournament(args):
+    seed_rng(args.seed)
+    for i in range(len(args.strategies)): # round robin, every strategy against every other (and itself if asked)
+        for j in range(i if args.self_play else i+1,len(args.strategies)):
+            emit(matchup(args.strategies[i],args.strategies[j],args.games))
+
+def bench(args):
+    import sim_scaffolding # already loaded by main, which timed it
+
+    seed_rng(args.seed)
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        sim_scaffolding.simulate_games(build(args.p1),build(args.p2),n_games=args.games,verbose=False)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    emit({'p1':label(args.p1),'p2':label(args.p2),'games':args.games,'repeat':args.repeat,'import_seconds':round(args.import_seconds,6),'best_seconds':round(best,6),'games_per_second':round(args.games/best,1) if best else None})
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='fingerbaseball',description='batch finger baseball simulations with JSON line output')
+    sub = parser.add_subparsers(dest='command',required=True)
+
+    p = sub.add_parser('simulate',help='play a series of games between two strategies')
+    p.add_argument('p1',type=parse_strategy)
+    p.add_argument('p2',type=parse_strategy)
+    p.set_defaults(func=simulate)
+
+    p = sub.add_parser('tournament',help='round robin between several strategies, one line per matchup')
+    p.add_argument('strategies',type=parse_strategy,nargs='+')
+    p.add_argument('--self-play',action='store_true',help='also play each strategy against itself')
+    p.set_defaults(func=tournament)
+
+    p = sub.add_parser('bench',help='time import and simulation speed')
+    p.add_argument('p1',type=parse_strategy,nargs='?',default=('random',{}))
+    p.add_argument('p2',type=parse_strategy,nargs='?',default=('random',{}))
+    p.add_argument('--repeat',type=positive_int,default=3,help='number of timed runs (best is reported)')
+    p.set_defaults(func=bench)
+
+    for p in sub.choices.values():
+        p.add_argument('--games',type=positive_int,default=1000,help='number of games per matchup')
+        p.add_argument('--seed',type=int,default=None,help='seed for the random number generator')
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # load the simulator once arguments have parsed, timing it for bench since it is what a cold job pays for
+    start = time.perf_counter()
+    import players, sim_scaffolding
+    args.import_seconds = time.perf_counter() - start
+
+    # build every strategy once up front, so a bad spec is reported before any results are printed
+    specs = [getattr(args,key) for key in ('p1','p2') if hasattr(args,key)] + getattr(args,'strategies',[])
+    try:
+        for spec in specs:
+            build(spec)
+    except StrategyError as e:
+        print('fingerbaseball: error: {}'.format(e),file=sys.stderr)
+        return 2
+
+    args.func(args)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
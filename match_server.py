@@ -0,0 +1,238 @@
+import asyncio
+from util import Game
+from numpy.random import choice
+
+class PolicyServerStopped(Exception):
+    '''
+    raised for move requests a policy server will no longer answer because it has been stopped
+    '''
+    pass
+
+class LocalPolicyServer:
+    '''
+    stand-in for a policy served from another process: collects move requests from many in-flight games and answers them in batches
+    '''
+    def __init__(self,latency=0.0,max_batch=256,max_wait=0.0):
+        '''
+        creates a server instance
+        latency (float): seconds each batch takes to come back, to mimic a slow or remote policy
+        max_batch (int): largest number of move requests answered in one batch
+        max_wait (float): seconds to wait for other games to send requests before answering a batch (0 just lets every ready game submit)
+        '''
+        self.latency = latency
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = None
+        self.worker = None
+        self.batches = 0 # number of batches answered
+        self.requests = 0 # number of move requests answered
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self,*exc):
+        await self.stop()
+
+    def start(self):
+        '''
+        start answering requests (must be called from inside a running event loop)
+        '''
+        if self.worker is None:
+            self.queue = asyncio.Queue()
+            self.worker = asyncio.create_task(self.serve())
+
+    async def stop(self):
+        '''
+        stop answering requests, failing any that are still waiting with PolicyServerStopped
+        '''
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+
+            # requests that never made it into a batch
+            while not self.queue.empty():
+                _,_,future = self.queue.get_nowait()
+                if not future.done():
+                    future.set_exception(PolicyServerStopped('policy server stopped before answering'))
+
+    async def move(self,player,state):
+        '''
+        request a move for player given the state of its game, returning once the batch containing it has been answered
+        player (Player): player whose policy should pick the move
+        state (tuple): state of the game, as returned by Game.state()
+        '''
+        if self.worker is None:
+            raise PolicyServerStopped('policy server is not running')
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((player,state,future))
+        return await future
+
+    async def evaluate(self,batch):
+        '''
+        pick a move for every (player, state) request in the batch, returned in the same order
+        the stand-in waits latency seconds and then asks each player; override this coroutine to send the batch to an actual model,
+        awaiting the reply (or running blocking work with loop.run_in_executor) so other batches and games keep going meanwhile
+        '''
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [player.move(*state) for player,state in batch]
+
+    async def serve(self):
+        '''
+        loop that drains queued requests into batches and resolves each request with its move
+        '''
+        requests = []
+        try:
+            while True:
+                requests = [await self.queue.get()]
+
+                # give the other in-flight games a chance to send their requests too
+                await asyncio.sleep(self.max_wait)
+                while len(requests) < self.max_batch and not self.queue.empty():
+                    requests.append(self.queue.get_nowait())
+
+                try:
+                    moves = await self.evaluate([(player,state) for player,state,_ in requests])
+                except Exception as e: # hand the error to every game waiting on this batch
+                    for _,_,future in requests:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                for (_,_,future),chosen in zip(requests,moves):
+                    if not future.done(): # game may have been cancelled while waiting
+                        future.set_result(chosen)
+
+                self.batches += 1
+                self.requests += len(requests)
+
+        except asyncio.CancelledError: # stopped part way through a batch, so fail the requests in it
+            for _,_,future in requests:
+                if not future.done():
+                    future.set_exception(PolicyServerStopped('policy server stopped before answering'))
+            raise
+
+async def play_game_async(p1,p2,server1,server2=None,last_game=None,first_team_home_last_game=True,stats=None):
+    '''
+    coroutine version of sim_scaffolding.play_game, which asks policy servers for moves so other games can proceed while waiting
+    p1 (Player): player 1
+    p2 (Player): player 2
+    server1 (LocalPolicyServer): server answering moves for player 1
+    server2 (LocalPolicyServer): server answering moves for player 2 (defaults to server1)
+    last_game (Game): instance of last game to carry over
+    first_team_home_last_game (bool): if player 1 was home last game (default to true)
+    stats (SituationalStats): records every play of the game if given (one instance can be shared by all games in flight)
+    '''
+    if server2 is None:
+        server2 = server1
+
+    # if no last game, use a default game (with no actions history) to bring in actions histories
+    if last_game is None:
+        last_game = Game()
+
+    # set home team
+    first_team_home = choice([True,False])
+    p1.home = first_team_home
+    p2.home = not first_team_home
+
+    # initialize game, carrying over results of last game
+    if first_team_home == first_team_home_last_game: # if same home team as last game
+        game = Game(last_game.home_pitch_history,last_game.home_bat_history,last_game.away_pitch_history,last_game.away_bat_history)
+    else: # if different home team, pull in histories in reverse
+        game = Game(last_game.away_pitch_history,last_game.away_bat_history,last_game.home_pitch_history,last_game.home_bat_history)
+
+    # play ball!
+    while not game.over:
+
+        # find out if player 1 is pitching
+        p1_pitching = (p1.home and game.top) or (not p1.home and not game.top)
+
+        # grab state of game
+        state = game.state()
+
+        # update policies of players (if necessary)
+        p1.update(*state)
+        p2.update(*state)
+
+        # request both actions at once so the two servers work in parallel
+        p1_move, p2_move = await asyncio.gather(server1.move(p1,state),server2.move(p2,state))
+
+        pitcher, batter = (p1_move,p2_move) if p1_pitching else (p2_move,p1_move)
+        if stats is None:
+            game.play(pitcher,batter)
+        else:
+            stats.play(game,pitcher,batter)
+
+    return game
+
+async def play_series_async(p1,p2,server1,server2=None,n_games=1000,slots=None,stats=None):
+    '''
+    play n_games between p1 and p2 one after another, carrying histories over like sim_scaffolding.simulate_games
+    returns (p1 wins, p2 wins, p1 runs, p2 runs)
+    slots (asyncio.Semaphore): limits how many games are in flight across all series (optional)
+    stats (SituationalStats): records every play if given
+    '''
+    p1_wins = p2_wins = p1_runs = p2_runs = 0
+    game = None
+
+    for i in range(n_games):
+        first_team_home_last = True if game is None else p1.home
+        if slots is None:
+            game = await play_game_async(p1,p2,server1,server2,last_game=game,first_team_home_last_game=first_team_home_last,stats=stats)
+        else:
+            async with slots:
+                game = await play_game_async(p1,p2,server1,server2,last_game=game,first_team_home_last_game=first_team_home_last,stats=stats)
+
+        p1_score = game.home_score if p1.home else game.away_score
+        p2_score = game.away_score if p1.home else game.home_score
+        if p1_score > p2_score:
+            p1_wins += 1
+        else:
+            p2_wins += 1
+        p1_runs += p1_score
+        p2_runs += p2_score
+
+    return p1_wins,p2_wins,p1_runs,p2_runs
+
+async def run_series_async(series,max_in_flight=256,stats=None):
+    '''
+    interleave many series of games on the running event loop, returning one result tuple per series (see play_series_async)
+    series (list): tuples of (p1, p2, server1, server2, n_games); each series needs its own player instances
+    max_in_flight (int): most games allowed to be in progress at once
+    stats (SituationalStats): records every play of every series if given
+    '''
+    slots = asyncio.Semaphore(max_in_flight)
+
+    # start every server used by these series (starting is a no-op for ones already running)
+    servers = []
+    for _,_,server1,server2,_ in series:
+        for server in (server1,server2):
+            if server is not None and server.worker is None and server not in servers:
+                server.start()
+                servers.append(server)
+
+    tasks = [asyncio.create_task(play_series_async(p1,p2,server1,server2,n_games,slots,stats)) for p1,p2,server1,server2,n_games in series]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException: # one series failed (or we were cancelled), so cancel the rest before their servers go away
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks,return_exceptions=True)
+        raise
+    finally:
+        for server in servers: # only stop the servers started here
+            await server.stop()
+
+def run_series(series,max_in_flight=256,stats=None):
+    '''
+    run_series_async from synchronous code
+    series (list): tuples of (p1, p2, server1, server2, n_games); each series needs its own player instances
+    max_in_flight (int): most games allowed to be in progress at once
+    stats (SituationalStats): records every play of every series if given
+    '''
+    return asyncio.run(run_series_async(series,max_in_flight=max_in_flight,stats=stats))
@@ -1,10 +1,11 @@
-from numpy.random import choice
+from numpy import random as global_rng
 from numpy import unique, array, argsort, multiply, sqrt, select
 
 class Player():
     '''
     base class for player, which takes random actions by default
     '''
+    rng = global_rng # source of randomness for every move: NumPy's global generator unless an instance is given its own (anything with choice and random like numpy's, e.g. variance.UniformStream)
     def __init__(self,home=None):
         '''
         creates a player instance
@@ -24,7 +25,7 @@ class Player():
         '''
         method for deciding a move based on the current state of the game
         '''
-        chosen = choice(self.options)
+        chosen = self.rng.choice(self.options)
 
         return chosen
 
@@ -49,10 +50,10 @@ class ConservativePlayer(Player):
         '''
 
         if (self.home and top) or (not self.home and not top): # if pitching
-            chosen = choice(self.options,p=self.pitching_probs)
+            chosen = self.rng.choice(self.options,p=self.pitching_probs)
 
         else: # if batting
-            chosen = choice(self.options,p=self.batting_probs)
+            chosen = self.rng.choice(self.options,p=self.batting_probs)
 
         return chosen
 
@@ -104,7 +105,7 @@ class CalculatedPlayer(Player):
                     probs[probs_index] = probs[probs_index[::-1]] # swap largest probability with smallest and second largest probability with second smallest
 
                 else: # if not all numbers have been played, just randomly pick a number that hasn't been played yet and skip the rest
-                    chosen = choice([i+1 for i in range(5) if i+1 not in arr])
+                    chosen = self.rng.choice([i+1 for i in range(5) if i+1 not in arr])
                     return chosen
 
         else:
@@ -112,7 +113,7 @@ class CalculatedPlayer(Player):
             probs = [0.2 for i in range(5)]
 
         # make choice of action
-        chosen = choice(arr,p=probs)
+        chosen = self.rng.choice(arr,p=probs)
 
         return chosen
 
@@ -138,7 +139,7 @@ class OnesAndTwos(Player):
         else:
             options = [1,2,3,4,5]
 
-        chosen = choice(options)
+        chosen = self.rng.choice(options)
         return chosen
 
 class ExpectedValuePlayer(Player):
@@ -199,7 +200,7 @@ class ExpectedValuePlayer(Player):
                     probs[probs_index] = probs[probs_index[::-1]] # swap largest probability with smallest and second largest probability with second smallest
 
                 else: # if not all numbers have been played, just randomly pick a number that hasn't been played yet and skip the rest
-                    chosen = choice([i+1 for i in range(5) if i+1 not in arr])
+                    chosen = self.rng.choice([i+1 for i in range(5) if i+1 not in arr])
                     return chosen
 
         else: # choose randomly
@@ -208,6 +209,118 @@ class ExpectedValuePlayer(Player):
 
 
         # make choice of action
-        chosen = choice(arr,p=probs)
+        chosen = self.rng.choice(arr,p=probs)
 
         return chosen
+
+class NGramPlayer(Player):
+    '''
+    player that models the opponent as a Markov chain: it keeps running counts of which finger follows each run of the opponent's last (order) fingers, separately for their pitches and their swings
+    '''
+    def __init__(self,home=None,order=2,prior=1):
+        '''
+        creates an instance
+        home (bool): if the player is the home team
+        order (int): how many previous opponent fingers make up the context for a prediction
+        prior (float): pseudo-count added to every finger, so unseen fingers are still possible
+        '''
+        if isinstance(order,bool) or not isinstance(order,int) or order < 0:
+            raise ValueError('order must be a non-negative int, got {!r}'.format(order))
+        if isinstance(prior,bool) or not isinstance(prior,(int,float)) or prior < 0:
+            raise ValueError('prior must be a number at least 0, got {!r}'.format(prior))
+        self.home = home
+        self.options = [1,2,3,4,5]
+        self.name = 'N-Gram Player'
+        self.order = order
+        self.prior = prior
+        self.n_contexts = 5 ** order
+        self.reset()
+
+    def reset(self):
+        '''
+        forget everything learned about the opponent
+        '''
+        # flat count tables, five counts (one per finger) for each context, plus order 0 counts to fall back on for unseen contexts
+        self.pitch_counts = [0] * (self.n_contexts * 5)
+        self.bat_counts = [0] * (self.n_contexts * 5)
+        self.pitch_marginal = [0] * 5
+        self.bat_marginal = [0] * 5
+        self.pitch_context = 0 # base-5 code of the opponent's last (order) pitches, only meaningful once that many have been seen
+        self.bat_context = 0 # base-5 code of the opponent's last (order) swings, only meaningful once that many have been seen
+        self.pitch_seen = 0 # how much of the opponent's pitch history has been counted
+        self.bat_seen = 0 # how much of the opponent's bat history has been counted
+
+    def ingest(self,counts,marginal,context,seen,finger):
+        '''
+        count one new opponent finger in its context, returning the updated context
+        seen (int): number of opponent fingers counted before this one; until it reaches order the context is incomplete and only the overall counts are updated
+        '''
+        if seen >= self.order:
+            counts[context * 5 + finger - 1] += 1
+        marginal[finger - 1] += 1
+        return (context * 5 + finger - 1) % self.n_contexts
+
+    def update(self,inning,top,outs,home_score,away_score,diamond,play_number,home_pitch_history,home_bat_history,away_pitch_history,away_bat_history):
+        '''
+        count any opponent fingers added to the histories since the last call (normally at most one, so this is O(1) per play)
+        '''
+        opponent_pitches = away_pitch_history if self.home else home_pitch_history
+        opponent_swings = away_bat_history if self.home else home_bat_history
+
+        if len(opponent_pitches) < self.pitch_seen or len(opponent_swings) < self.bat_seen: # histories were started over, so start over too
+            self.reset()
+
+        for seen,finger in enumerate(opponent_pitches[self.pitch_seen:],self.pitch_seen):
+            self.pitch_context = self.ingest(self.pitch_counts,self.pitch_marginal,self.pitch_context,seen,finger)
+        self.pitch_seen = len(opponent_pitches)
+
+        for seen,finger in enumerate(opponent_swings[self.bat_seen:],self.bat_seen):
+            self.bat_context = self.ingest(self.bat_counts,self.bat_marginal,self.bat_context,seen,finger)
+        self.bat_seen = len(opponent_swings)
+
+    def predict(self,counts,marginal,context,seen):
+        '''
+        return the opponent's predicted finger counts for the given context, falling back to overall counts for an incomplete or unseen context
+        '''
+        row = counts[context * 5:context * 5 + 5]
+        if seen < self.order or sum(row) == 0:
+            row = marginal
+        return [c + self.prior for c in row]
+
+    def move(self,inning,top,outs,home_score,away_score,diamond,play_number,home_pitch_history,home_bat_history,away_pitch_history,away_bat_history):
+        '''
+        method for deciding a move by looking up the opponent's likely next finger: match it when batting, avoid it when pitching
+        '''
+        self.update(inning,top,outs,home_score,away_score,diamond,play_number,home_pitch_history,home_bat_history,away_pitch_history,away_bat_history) # no-op if already up to date
+
+        pitching = (self.home and top) or (not self.home and not top) # true if pitching
+
+        if pitching: # "reverse" the predicted swings like CalculatedPlayer: the most likely swing gets the smallest weight and so on
+            predicted = self.predict(self.bat_counts,self.bat_marginal,self.bat_context,self.bat_seen)
+            order = sorted(range(5),key=predicted.__getitem__)
+            weights = [0] * 5
+            for rank,finger_index in enumerate(order):
+                weights[finger_index] = predicted[order[4 - rank]]
+        else: # weight each finger by the chance the opponent pitches it
+            weights = self.predict(self.pitch_counts,self.pitch_marginal,self.pitch_context,self.pitch_seen)
+
+        if sum(weights) == 0: # nothing seen yet and no prior, so pick at random
+            return self.rng.choice(self.options)
+
+        # sample from the weights (a plain scan is much cheaper than choice for five options)
+        threshold = self.rng.random() * sum(weights)
+        for finger,weight in zip(self.options,weights):
+            threshold -= weight
+            if threshold < 0:
+                return finger
+        return self.options[-1]
+
+# registry of strategies by name, so scripts and the command line can build players without importing each class
+REGISTRY = {
+    'random': Player,
+    'conservative': ConservativePlayer,
+    'calculated': CalculatedPlayer,
+    'ones-and-twos': OnesAndTwos,
+    'expected-value': ExpectedValuePlayer,
+    'ngram': NGramPlayer,
+}
@@ -22,7 +22,8 @@ print('\n\nSimulating {} games between Team A and Team B, randomly assigning hom
 A_wins = 0
 B_wins = 0
 
-# simulate 10000 sample games
+# simulate sample games, reusing one game instance throughout
+game = Game()
 for i in range(n):
 
     # print game number if 10th of the way there:
@@ -30,7 +31,7 @@ for i in range(n):
         print('Simulating Game #' + str(i+1))
 
     # initialize and simulate game
-    game = Game()
+    game.reset()
     A_home = choice([True,False]) # randomly choose if A is home team
     while not game.over:
         pitcher = choice(options)
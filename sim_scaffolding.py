@@ -1,9 +1,8 @@
-from util import Game
+from util import Game, GamePool
 from numpy.random import choice
 from numpy import cumsum, unique
-import matplotlib.pyplot as plt
 
-def play_game(p1,p2,last_game = None,first_team_home_last_game=True,echo=False):
+def play_game(p1,p2,last_game = None,first_team_home_last_game=True,echo=False,first_team_home=None,stats=None,pool=None,streams=None):
     '''
     function that simulates a game between player1 and player 2
     p1 (Player): player 1
@@ -11,14 +10,15 @@ def play_game(p1,p2,last_game = None,first_team_home_last_game=True,echo=False):
     last_game (Game): instance of last game to carry over
     first_team_home_last_game (bool): if player 1 was home last game (default to true)
     echo (bool): whether or not to print results of game
+    first_team_home (bool): if player 1 is home this game (default to a random pick)
+    stats (SituationalStats): records every play of the game if given
+    pool (GamePool): pool to take the new game from, instead of allocating one
+    streams (tuple): random sources keyed by who is batting, ((pitching, batting) while player 1 bats, (pitching, batting) while player 2 bats), handed to whichever player holds each role on each play instead of each player drawing from its own
     '''
 
-    # if no last game, use a default game (with no actions history) to bring in actions histories
-    if last_game is None:
-        last_game = Game()
-
     # set home team
-    first_team_home = choice([True,False])
+    if first_team_home is None:
+        first_team_home = choice([True,False])
 
     if first_team_home:
         p1.home = True
@@ -28,10 +28,13 @@ def play_game(p1,p2,last_game = None,first_team_home_last_game=True,echo=False):
         p2.home = True
 
     # initialize game, carrying over results of last game
-    if first_team_home == first_team_home_last_game: # if same home team as last game
-        game = Game(last_game.home_pitch_history,last_game.home_bat_history,last_game.away_pitch_history,last_game.away_bat_history)
+    new_game = Game if pool is None else pool.acquire
+    if last_game is None: # no last game, so start with empty actions histories
+        game = new_game()
+    elif first_team_home == first_team_home_last_game: # if same home team as last game
+        game = new_game(last_game.home_pitch_history,last_game.home_bat_history,last_game.away_pitch_history,last_game.away_bat_history)
     else: # if different home team, pull in histories in reverse, putting last
-        game = Game(last_game.away_pitch_history,last_game.away_bat_history,last_game.home_pitch_history,last_game.home_bat_history)
+        game = new_game(last_game.away_pitch_history,last_game.away_bat_history,last_game.home_pitch_history,last_game.home_bat_history)
 
     # play ball!
     while not game.over:
@@ -46,11 +49,21 @@ def play_game(p1,p2,last_game = None,first_team_home_last_game=True,echo=False):
         p1.update(*state)
         p2.update(*state)
 
+        # hand out random sources by role if asked (see variance.play_pairs)
+        if streams is not None:
+            if p1_pitching:
+                p1.rng, p2.rng = streams[1]
+            else:
+                p2.rng, p1.rng = streams[0]
+
         # select actions
         pitcher = p1.move(*state) if p1_pitching else p2.move(*state)
         batter = p2.move(*state) if p1_pitching else p1.move(*state)
 
-        game.play(pitcher,batter)
+        if stats is None:
+            game.play(pitcher,batter)
+        else:
+            stats.play(game,pitcher,batter)
 
         # print game results if echo is turned on
         if echo:
@@ -58,14 +71,16 @@ def play_game(p1,p2,last_game = None,first_team_home_last_game=True,echo=False):
 
     return game
 
-def simulate_games(p1,p2,n_games = 1000,echo_first_game = False,plot=False):
+def simulate_games(p1,p2,n_games = 1000,echo_first_game = False,plot=False,verbose=True,stats=None):
     '''
-    simulate games
+    simulate games, returning a dict of total wins and runs for each player
     p1 (Player): player 1
     p2 (Player): player 2
     n_games (int): number of games to play
     echo_first_game (bool): show results of first game
     plot (bool): plot game results over time
+    verbose (bool): print progress messages
+    stats (SituationalStats): records every play of every game if given
     '''
 
     # initialize first game and counters
@@ -75,8 +90,10 @@ def simulate_games(p1,p2,n_games = 1000,echo_first_game = False,plot=False):
     p1_runs = []
     p2_runs = []
     innings = []
+    pool = GamePool() # each game is only needed until the next one has taken over its histories
 
-    print('{} vs. {}'.format(p1.name,p2.name))
+    if verbose:
+        print('{} vs. {}'.format(p1.name,p2.name))
 
     # simulate games
     for i in range(n_games):
@@ -92,15 +109,18 @@ def simulate_games(p1,p2,n_games = 1000,echo_first_game = False,plot=False):
                     print(p2.name + ' is home team in first game. Showing first game then simulating the rest...\n')
                 else:
                     print('Second {} is home team in first game. Showing first game then simulating the rest...\n'.format(p1.name))
-            game = play_game(p1,p2,last_game = Game(),echo=True)
+            game = play_game(p1,p2,last_game = None,echo=True,stats=stats,pool=pool)
 
         elif i == 0: # first game without echo
-            print('Simulating games...')
-            game = play_game(p1,p2,last_game = Game(),echo=False)
+            if verbose:
+                print('Simulating games...')
+            game = play_game(p1,p2,last_game = None,echo=False,stats=stats,pool=pool)
 
         else: # the rest of the games
             first_team_home_last = p1.home
-            game = play_game(p1,p2,first_team_home_last_game=first_team_home_last,last_game=game)
+            last_game = game
+            game = play_game(p1,p2,first_team_home_last_game=first_team_home_last,last_game=last_game,stats=stats,pool=pool)
+            pool.release(last_game)
 
         # summarize results of game
         if p1.home:
@@ -136,6 +156,8 @@ def simulate_games(p1,p2,n_games = 1000,echo_first_game = False,plot=False):
 
     if plot: # plot if outlined
 
+        import matplotlib.pyplot as plt # imported here so batch runs without plots skip the matplotlib startup cost
+
         figsize = (14,4)
         xlab = 18
         ylab = 18
@@ -238,4 +260,4 @@ def simulate_games(p1,p2,n_games = 1000,echo_first_game = False,plot=False):
         plt.show()
 
 
-    return # can carry over these results to something else later
+    return {'p1_wins':sum(p1_wins),'p2_wins':sum(p2_wins),'p1_runs':int(sum(p1_runs)),'p2_runs':int(sum(p2_runs))}
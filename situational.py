@@ -0,0 +1,140 @@
+from numpy import zeros, errstate, nan_to_num
+
+N_BASES = 8 # runners on first/second/third, coded first + 2*second + 4*third
+N_OUTS = 3
+MAX_INNING = 10 # the 10th and every later inning share a row
+MAX_LEAD = 10 # score differences beyond this are treated as this
+N_WE = MAX_INNING * 2 * N_OUTS * N_BASES * (2 * MAX_LEAD + 1) # number of win expectancy states
+AWAY_WIN = N_WE # terminal states used as the "after" state of a game's last play
+HOME_WIN = N_WE + 1
+OUTCOMES = ['Out','Single','Double','Triple','Home Run','Grand Slam']
+
+def base_state(diamond):
+    '''
+    code the runners on a diamond as an int from 0 (bases empty) to 7 (bases loaded)
+    '''
+    return diamond.first + 2 * diamond.second + 4 * diamond.third
+
+def we_state(game):
+    '''
+    index of the game's current situation in the win expectancy tables
+    '''
+    inning = min(game.inning,MAX_INNING) - 1
+    lead = max(-MAX_LEAD,min(MAX_LEAD,game.home_score - game.away_score)) + MAX_LEAD
+    return (((inning * 2 + (not game.top)) * N_OUTS + game.outs) * N_BASES + base_state(game.diamond)) * (2 * MAX_LEAD + 1) + lead
+
+class SituationalStats:
+    '''
+    accumulates run expectancy, win expectancy, win probability added and per finger outcome tables over a stream of plays
+    all tables are fixed size count arrays, so stats gathered by separate workers combine with merge
+    '''
+    def __init__(self):
+        '''
+        start with empty tables
+        '''
+        # run expectancy: plays seen in each of the 24 base/out states and the runs scored from then to the end of the half inning
+        self.re_count = zeros((N_OUTS,N_BASES),dtype='int64')
+        self.re_runs = zeros((N_OUTS,N_BASES),dtype='int64')
+
+        # win expectancy: plays seen in each situation and how many of those games the home team won
+        self.we_count = zeros(N_WE,dtype='int64')
+        self.we_home_wins = zeros(N_WE,dtype='int64')
+
+        # win probability added: situations before and after each play, by half inning (0 top, 1 bottom) and outcome
+        self.wpa_before = zeros((2,len(OUTCOMES),N_WE + 2),dtype='int64')
+        self.wpa_after = zeros((2,len(OUTCOMES),N_WE + 2),dtype='int64')
+
+        # plays and runs scored for each pitch finger (rows) against each bat finger (columns)
+        self.finger_plays = zeros((5,5),dtype='int64')
+        self.finger_runs = zeros((5,5),dtype='int64')
+
+        self.pending = {} # per game in progress: ([(base/out state, batting score before)] for this half inning, [situations visited])
+
+    def play(self,game,pitch,bat):
+        '''
+        run a play of the game (like Game.play) and record it
+        game (Game): game to play, which may be one of many in progress
+        pitch (int): number flashed by pitching team
+        bat (int): number flashed by batting team
+        '''
+        half_plays, visited = self.pending.setdefault(game,([],[]))
+
+        top = game.top
+        outs = game.outs
+        bases = base_state(game.diamond)
+        before = we_state(game)
+        batting_score = game.away_score if top else game.home_score
+
+        game.play(pitch,bat)
+
+        runs = (game.away_score if top else game.home_score) - batting_score
+        outcome = pitch if pitch == bat else 0
+        half_plays.append((outs,bases,batting_score))
+        visited.append(before)
+
+        self.finger_plays[pitch-1,bat-1] += 1
+        self.finger_runs[pitch-1,bat-1] += runs
+
+        if game.over:
+            after = HOME_WIN if game.home_score > game.away_score else AWAY_WIN
+        else:
+            after = we_state(game)
+        self.wpa_before[int(not top),outcome,before] += 1
+        self.wpa_after[int(not top),outcome,after] += 1
+
+        if outcome == 0 and outs == 2: # three outs, so the half inning was played out and its run expectancy can be counted
+            final = game.away_score if top else game.home_score
+            for o,b,score in half_plays:
+                self.re_count[o,b] += 1
+                self.re_runs[o,b] += final - score
+            half_plays.clear()
+
+        if game.over: # walk offs leave the half inning unfinished, so those plays only count toward win expectancy
+            home_won = game.home_score > game.away_score
+            for s in visited:
+                self.we_count[s] += 1
+                self.we_home_wins[s] += home_won
+            del self.pending[game]
+
+    def merge(self,other):
+        '''
+        add another set of stats (e.g. from a parallel worker) into this one; games still in progress in other are not carried over
+        '''
+        for name in ('re_count','re_runs','we_count','we_home_wins','wpa_before','wpa_after','finger_plays','finger_runs'):
+            getattr(self,name).__iadd__(getattr(other,name))
+        return self
+
+    def run_expectancy(self):
+        '''
+        expected runs to the end of the half inning from each state, as an array indexed [outs, bases] (nan where never seen)
+        '''
+        with errstate(invalid='ignore',divide='ignore'):
+            return self.re_runs / self.re_count
+
+    def win_expectancy(self):
+        '''
+        chance the home team wins from each situation, indexed by we_state (nan where never seen)
+        '''
+        with errstate(invalid='ignore',divide='ignore'):
+            return self.we_home_wins / self.we_count
+
+    def win_probability_added(self):
+        '''
+        average change in the batting team's chance of winning for each outcome (ordered like OUTCOMES)
+        '''
+        we = zeros(N_WE + 2)
+        we[:N_WE] = nan_to_num(self.win_expectancy(),nan=0.5)
+        we[HOME_WIN] = 1.0
+
+        home_gain = (self.wpa_after @ we) - (self.wpa_before @ we) # total change in home win chance, by half inning and outcome
+        batting_gain = home_gain[1] - home_gain[0] # the away team bats in the top half
+        plays = self.wpa_before.sum(axis=(0,2))
+        with errstate(invalid='ignore',divide='ignore'):
+            return batting_gain / plays
+
+    def finger_table(self):
+        '''
+        plays and average runs scored per play for each pitch finger (rows) against each bat finger (columns)
+        '''
+        with errstate(invalid='ignore',divide='ignore'):
+            return self.finger_plays, self.finger_runs / self.finger_plays
@@ -1,14 +1,23 @@
-from copy import deepcopy
-from numpy.random import choice
+# text for each Game.last_act_code: no play yet, an out, then the hit for each finger
+ACTS = (None,'Out','Single','Double','Triple','Home Run','Grand Slam')
+NO_ACT, OUT, SINGLE, DOUBLE, TRIPLE, HOME_RUN, GRAND_SLAM = range(len(ACTS))
 
 class Diamond:
     '''
     class to store state of diamond, with methods for returning runs scored
     '''
+    __slots__ = ('first','second','third','scores')
+
     def __init__(self):
         '''
         initialize empty baseball diamond that will update based on each action
         '''
+        self.reset()
+
+    def reset(self):
+        '''
+        empty the diamond and the scores counter, so the instance can be reused for a new game
+        '''
         self.first = False #first base
         self.second = False #second base
         self.third = False #third base
@@ -18,7 +27,7 @@ class Diamond:
         '''
         clears "scores" counter and converts to runs, which are returned
         '''
-        rns = deepcopy(self.scores)
+        rns = self.scores
         self.scores = 0
         return rns
 
@@ -100,23 +109,45 @@ class Game:
     '''
     Tracks the state of a game
     '''
+    __slots__ = ('inning','outs','top','away_score','home_score','diamond','over','last_act_code','play_number','home_pitch_history','home_bat_history','away_pitch_history','away_bat_history')
+
     def __init__(self,home_pitch_history = None, home_bat_history= None,away_pitch_history = None,away_bat_history= None):
         '''
         begin a game
         '''
+        self.diamond = Diamond()
+        self.reset(home_pitch_history,home_bat_history,away_pitch_history,away_bat_history)
+
+    def reset(self,home_pitch_history = None, home_bat_history= None,away_pitch_history = None,away_bat_history= None):
+        '''
+        start a new game in this instance (reusing its diamond), taking the same arguments as Game()
+        history lists are swapped in, never cleared, since the previous game's lists may have been carried over to another game
+        '''
         self.inning = 1
         self.outs = 0
         self.top = True
         self.away_score = 0
         self.home_score = 0
-        self.diamond = Diamond()
+        self.diamond.reset()
         self.over = False # if game is over
-        self.last_act = None
+        self.last_act_code = NO_ACT # index into ACTS, turned into text only when displayed
         self.play_number = 1
         self.home_pitch_history = [] if home_pitch_history is None else home_pitch_history
         self.home_bat_history = [] if home_bat_history is None else home_bat_history
         self.away_pitch_history = [] if away_pitch_history is None else away_pitch_history
         self.away_bat_history = [] if away_bat_history is None else away_bat_history
+        return self
+
+    @property
+    def last_act(self):
+        '''
+        text of the last play ('Out', 'Single', ...), or None before the first play
+        '''
+        return ACTS[self.last_act_code]
+
+    @last_act.setter
+    def last_act(self,act):
+        self.last_act_code = ACTS.index(act)
 
     def inning_to_string(self):
         '''
@@ -154,9 +185,9 @@ class Game:
                 runners += ' 3rd'
 
         if self.away_score > self.home_score:
-            res = "{act} for {tm}! Away {aw}, Home {hs} with {outs} outs in the {tp} of the {inn}, {rnrs}".format(act=self.last_act,tm=tm,aw=self.away_score,hs=self.home_score,outs=self.outs,tp=tp,inn=inn,rnrs = runners)
+            res = "{act} for {tm}! Away {aw}, Home {hs} with {outs} outs in the {tp} of the {inn}, {rnrs}".format(act=ACTS[self.last_act_code],tm=tm,aw=self.away_score,hs=self.home_score,outs=self.outs,tp=tp,inn=inn,rnrs = runners)
         else:
-            res = "{act} for {tm}! Home {hs}, Away {aw} with {outs} outs in the {tp} of the {inn}, {rnrs}".format(act=self.last_act,tm=tm,aw=self.away_score,hs=self.home_score,outs=self.outs,tp=tp,inn=inn,rnrs = runners)
+            res = "{act} for {tm}! Home {hs}, Away {aw} with {outs} outs in the {tp} of the {inn}, {rnrs}".format(act=ACTS[self.last_act_code],tm=tm,aw=self.away_score,hs=self.home_score,outs=self.outs,tp=tp,inn=inn,rnrs = runners)
 
         if self.over: # if game is over, show the final score too
             if self.home_score > self.away_score: # home team won
@@ -187,22 +218,22 @@ class Game:
 
             if pitch == bat == 1:
                 self.away_score += self.diamond.single()
-                self.last_act = 'Single'
+                self.last_act_code = SINGLE
             elif pitch == bat == 2:
                 self.away_score += self.diamond.double()
-                self.last_act = 'Double'
+                self.last_act_code = DOUBLE
             elif pitch == bat == 3:
                 self.away_score += self.diamond.triple()
-                self.last_act = 'Triple'
+                self.last_act_code = TRIPLE
             elif pitch == bat == 4:
                 self.away_score += self.diamond.home_run()
-                self.last_act = 'Home Run'
+                self.last_act_code = HOME_RUN
             elif pitch == bat == 5:
                 self.away_score += self.diamond.grand_slam()
-                self.last_act = 'Grand Slam'
+                self.last_act_code = GRAND_SLAM
 
             else: # if numbers do not match
-                self.last_act = 'Out'
+                self.last_act_code = OUT
 
                 self.outs +=1 # record an out
                 if self.outs == 3: # end the half inning
@@ -221,40 +252,40 @@ class Game:
 
             if pitch == bat == 1:
                 self.home_score += self.diamond.single()
-                self.last_act = 'Single'
+                self.last_act_code = SINGLE
                 if self.inning >= 9 and self.home_score > self.away_score: # walk off, game is over
                     self.over = True
 
             elif pitch == bat == 2:
                 self.home_score += self.diamond.double()
-                self.last_act = 'Double'
+                self.last_act_code = DOUBLE
 
                 if self.inning >= 9 and self.home_score > self.away_score: # walk off, game is over
                     self.over = True
 
             elif pitch == bat == 3:
                 self.home_score += self.diamond.triple()
-                self.last_act = 'Triple'
+                self.last_act_code = TRIPLE
 
                 if self.inning >= 9 and self.home_score > self.away_score: # walk off, game is over
                     self.over = True
 
             elif pitch == bat == 4:
                 self.home_score += self.diamond.home_run()
-                self.last_act = 'Home Run'
+                self.last_act_code = HOME_RUN
 
                 if self.inning >= 9 and self.home_score > self.away_score: # walk off, game is over
                     self.over = True
 
             elif pitch == bat == 5:
                 self.home_score += self.diamond.grand_slam()
-                self.last_act = 'Grand Slam'
+                self.last_act_code = GRAND_SLAM
 
                 if self.inning >= 9 and self.home_score > self.away_score: # walk off, game is over
                     self.over = True
 
             else: # if numbers do not match
-                self.last_act = 'Out'
+                self.last_act_code = OUT
                 self.outs +=1 # record an out
 
                 if self.outs == 3: # end the half inning
@@ -270,3 +301,27 @@ class Game:
 
         # increment the play number
         self.play_number += 1
+
+class GamePool:
+    '''
+    keeps finished Game instances around so tight simulation loops can reuse them instead of allocating new ones
+    '''
+    def __init__(self):
+        '''
+        start with an empty pool
+        '''
+        self.free = []
+
+    def acquire(self,home_pitch_history = None, home_bat_history= None,away_pitch_history = None,away_bat_history= None):
+        '''
+        return a fresh game (reset from the pool when one is available), taking the same arguments as Game()
+        '''
+        if self.free:
+            return self.free.pop().reset(home_pitch_history,home_bat_history,away_pitch_history,away_bat_history)
+        return Game(home_pitch_history,home_bat_history,away_pitch_history,away_bat_history)
+
+    def release(self,game):
+        '''
+        hand a game back once nothing refers to it any more (its history lists may live on in later games)
+        '''
+        self.free.append(game)
@@ -0,0 +1,122 @@
+from sim_scaffolding import play_game
+from util import GamePool
+from numpy.random import default_rng
+from numpy import array, array_split, sqrt
+from statistics import NormalDist
+
+class UniformStream:
+    '''
+    random source for a player (see Player.rng) that spends exactly one uniform draw on every move and picks fingers by inverse CDF
+    so the k-th draw always decides the k-th move whichever strategy makes it, and a low draw always means a low finger
+    '''
+    def __init__(self,seed,shift=0.0):
+        '''
+        seed (int or list): seed for the underlying numpy.random.Generator
+        shift (float): added to every draw (wrapping around at 1); a stream shifted by 0.5 is the antithetic partner of the unshifted one
+        '''
+        self.generator = default_rng(seed)
+        self.shift = shift
+
+    def random(self):
+        '''
+        one uniform draw in [0,1)
+        '''
+        return (self.generator.random() + self.shift) % 1.0
+
+    def choice(self,options,p=None):
+        '''
+        pick one of the options (in the order given) with probabilities p, or uniformly if p is None, using a single draw
+        '''
+        u = self.random()
+        if p is None:
+            return options[min(int(u * len(options)),len(options) - 1)]
+        for option,prob in zip(options,p):
+            u -= prob
+            if u < 0:
+                return option
+        return options[-1]
+
+def pair_streams(seed,i,leg):
+    '''
+    random sources for leg 0 or 1 of pair i, in the layout play_game expects
+    each batting side has its own pitch and bat streams, so draw k is always the k-th play with that side batting, however the innings fall
+    the second leg shifts every pitch by half, so a pitch that was matched in the first leg is mostly missed in the second and vice versa
+    '''
+    shift = 0.5 if leg else 0.0
+    return tuple((UniformStream([seed,i,batting,0],shift),UniformStream([seed,i,batting,1])) for batting in (0,1))
+
+def play_pairs(make_p1,make_p2,n_pairs=500,seed=0):
+    '''
+    play antithetic pairs of games with common random numbers, returning per pair results for player 1
+    pair i draws from streams seeded by (seed, i, batting side, role), so any matchups played with the same seed see the same luck play for play (see pair_streams)
+    the two games of a pair swap home teams and use antithetic pitch draws, which makes their results negatively correlated
+    histories carry over from game to game as in sim_scaffolding.simulate_games, so consecutive pairs are not independent for adaptive players (confidence_interval uses batch means for this)
+    make_p1 (callable): returns a fresh player 1 (a player class works)
+    make_p2 (callable): returns a fresh player 2
+    n_pairs (int): number of home/away pairs to play
+    seed (int): base seed for the streams
+    returns (wins, run_diffs): arrays of player 1's win share (0, 0.5 or 1) and mean run differential per pair, in the order played
+    '''
+    p1 = make_p1()
+    p2 = make_p2()
+
+    wins = []
+    run_diffs = []
+    game = None
+    pool = GamePool()
+
+    for i in range(n_pairs):
+        pair_wins = 0
+        pair_runs = 0
+        for leg,first_team_home in enumerate((True,False)):
+            first_team_home_last = True if game is None else p1.home
+            last_game = game
+            game = play_game(p1,p2,last_game=last_game,first_team_home_last_game=first_team_home_last,first_team_home=first_team_home,pool=pool,streams=pair_streams(seed,i,leg))
+            if last_game is not None:
+                pool.release(last_game)
+
+            p1_score = game.home_score if p1.home else game.away_score
+            p2_score = game.away_score if p1.home else game.home_score
+            pair_wins += p1_score > p2_score
+            pair_runs += p1_score - p2_score
+
+        wins.append(pair_wins / 2)
+        run_diffs.append(pair_runs / 2)
+
+    return array(wins),array(run_diffs)
+
+def confidence_interval(samples,confidence=0.95,n_batches=20):
+    '''
+    normal approximation confidence interval for the mean of a series of pair results
+    the standard error comes from the means of n_batches consecutive batches, which stay close to independent even when neighbouring pairs are not (set n_batches to None to treat every sample as independent)
+    samples (array): one value per pair, in the order played
+    confidence (float): coverage of the interval
+    n_batches (int): number of batches for the batch means
+    '''
+    n = len(samples)
+    mean = float(samples.mean())
+    if n_batches is not None and n > n_batches:
+        samples = array([batch.mean() for batch in array_split(samples,n_batches)])
+    k = len(samples)
+    stderr = float(samples.std(ddof=1) / sqrt(k)) if k > 1 else float('inf')
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    return {'mean':mean,'low':mean - z*stderr,'high':mean + z*stderr,'stderr':stderr,'n':n}
+
+def matchup(make_p1,make_p2,n_pairs=500,seed=0,confidence=0.95,n_batches=20):
+    '''
+    estimate player 1's win rate and run differential against player 2, with confidence intervals
+    '''
+    wins, run_diffs = play_pairs(make_p1,make_p2,n_pairs=n_pairs,seed=seed)
+    return {'win_rate':confidence_interval(wins,confidence,n_batches),'run_diff':confidence_interval(run_diffs,confidence,n_batches)}
+
+def compare(make_a,make_b,make_opponent,n_pairs=500,seed=0,confidence=0.95,n_batches=20):
+    '''
+    estimate how much better strategy A does than strategy B against the same opponent
+    both matchups are played on the same streams, so the opponent gets the same luck whichever strategy it faces and the difference is taken pair by pair
+    make_a (callable): returns a fresh player using strategy A
+    make_b (callable): returns a fresh player using strategy B
+    make_opponent (callable): returns a fresh opponent (called once per matchup)
+    '''
+    a_wins, a_runs = play_pairs(make_a,make_opponent,n_pairs=n_pairs,seed=seed)
+    b_wins, b_runs = play_pairs(make_b,make_opponent,n_pairs=n_pairs,seed=seed)
+    return {'win_rate':confidence_interval(a_wins - b_wins,confidence,n_batches),'run_diff':confidence_interval(a_runs - b_runs,confidence,n_batches)}